@@ -13,7 +13,7 @@ Date: December 2024
 import os
 import sys
 import time
-import signal
+import shutil
 import subprocess
 import argparse
 from pathlib import Path
@@ -22,6 +22,12 @@ from pathlib import Path
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
+# Section rule reused by every header instead of rebuilding it per call
+SECTION_RULE = '=' * 60
+
+# Directories skipped when hunting for __pycache__ (recordings can hold thousands of files)
+PYCACHE_PRUNE_DIRS = frozenset({'__pycache__', 'recordings', 'logs', '.git'})
+
 class CameraSystemCleanup:
     """Handles comprehensive cleanup of camera system."""
     
@@ -40,6 +46,7 @@ class CameraSystemCleanup:
             '/dev/shm/camera_markers.txt',
             '/dev/shm/buffer_markers.txt',
             '/dev/shm/camera_status.json',
+            '/dev/shm/imx296_detection.json',
             '/dev/shm/lsl_stream.lock'
         ]
         self.process_names = [
@@ -52,19 +59,16 @@ class CameraSystemCleanup:
         
     def print_section(self, title):
         """Print a formatted section header."""
-        print(f"\n{'=' * 60}")
-        print(f"  {title}")
-        print(f"{'=' * 60}")
+        print(f"\n{SECTION_RULE}\n  {title}\n{SECTION_RULE}")
     
     def run_command(self, cmd, description, ignore_errors=True):
-        """Run a command with description and error handling."""
+        """Run an argv list (no shell) with description and error handling."""
         print(f"  → {description}...")
         try:
             result = subprocess.run(
                 cmd,
                 capture_output=True,
-                text=True,
-                shell=isinstance(cmd, str)
+                text=True
             )
             if result.returncode == 0 or ignore_errors:
                 if result.stdout.strip():
@@ -83,43 +87,84 @@ class CameraSystemCleanup:
                 print(f"    ❌ Error: {e}")
                 return False
     
+    def remove_path(self, path, description):
+        """Remove a file or directory in-process, using sudo only when permission is denied."""
+        path = Path(path)
+        print(f"  → {description}...")
+        try:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            return self.run_command(["sudo", "rm", "-rf", "--", str(path)], f"Remove {path} with sudo")
+        except OSError as e:
+            print(f"    ⚠️  Warning: {e}")
+            return False
+        print("    ✅ Done")
+        return True
+    
     def stop_systemd_services(self):
         """Stop all related systemd services."""
         self.print_section("STOPPING SYSTEMD SERVICES")
         
-        stopped_any = False
-        for service in self.systemd_services:
-            # Check if service exists and is active
-            check_cmd = f"systemctl is-active {service}"
-            result = subprocess.run(check_cmd, shell=True, capture_output=True, text=True)
-            
-            if result.returncode == 0:  # Service is active
-                print(f"  🔴 Stopping active service: {service}")
-                self.run_command(f"sudo systemctl stop {service}", f"Stop {service}")
-                stopped_any = True
-            else:
-                print(f"  ⚪ Service not active: {service}")
-        
-        if not stopped_any:
+        active_services = self.get_active_services()
+        if active_services:
+            print(f"  🔴 Stopping active services: {', '.join(active_services)}")
+            # systemctl accepts several units, so one sudo/systemctl spawn stops them all
+            self.run_command(["sudo", "systemctl", "stop", *active_services], "Stop active services")
+        else:
             print("  ✅ No active services found")
     
+    def get_active_services(self):
+        """Return the configured services that are active, using one systemctl call."""
+        # systemctl prints one state per unit, in the order given
+        try:
+            result = subprocess.run(
+                ['systemctl', 'is-active', *self.systemd_services],
+                capture_output=True, text=True
+            )
+        except OSError:
+            # No systemctl on this host, so no services can be active
+            return []
+        states = result.stdout.split()
+        return [service for service, state in zip(self.systemd_services, states) if state == 'active']
+    
+    def find_related_pids(self):
+        """Return PIDs of all related processes, using one pgrep call."""
+        # pgrep -f takes an extended regex, so one alternation covers every name
+        try:
+            result = subprocess.run(
+                ['pgrep', '-f', '|'.join(self.process_names)],
+                capture_output=True, text=True
+            )
+        except OSError:
+            # No pgrep on this host; nothing can be found to stop
+            return []
+        if result.returncode != 0:
+            return []
+        return [pid for pid in result.stdout.split() if pid.strip()]
+    
     def disable_systemd_services(self):
         """Disable and remove systemd service files."""
         self.print_section("REMOVING SYSTEMD SERVICE FILES")
         
-        removed_any = False
+        installed_services = []
         for service in self.systemd_services:
-            service_file = f"/etc/systemd/system/{service}.service"
-            if os.path.exists(service_file):
+            if os.path.exists(f"/etc/systemd/system/{service}.service"):
                 print(f"  🗑️  Removing service file: {service}.service")
-                self.run_command(f"sudo systemctl disable {service}", f"Disable {service}")
-                self.run_command(f"sudo rm {service_file}", f"Remove {service_file}")
-                removed_any = True
+                installed_services.append(service)
             else:
                 print(f"  ⚪ Service file not found: {service}.service")
         
-        if removed_any:
-            self.run_command("sudo systemctl daemon-reload", "Reload systemd daemon")
+        if installed_services:
+            # Disable and remove every unit with one call each instead of two per service
+            service_files = [f"/etc/systemd/system/{service}.service" for service in installed_services]
+            self.run_command(["sudo", "systemctl", "disable", *installed_services], "Disable services")
+            self.run_command(["sudo", "rm", *service_files], "Remove service files")
+            self.run_command(["sudo", "systemctl", "daemon-reload"], "Reload systemd daemon")
         else:
             print("  ✅ No service files to remove")
     
@@ -127,34 +172,19 @@ class CameraSystemCleanup:
         """Kill any running camera-related processes."""
         self.print_section("TERMINATING RELATED PROCESSES")
         
-        killed_any = False
-        for process_name in self.process_names:
-            # Find processes by name
-            find_cmd = f"pgrep -f {process_name}"
-            result = subprocess.run(find_cmd, shell=True, capture_output=True, text=True)
+        pids = self.find_related_pids()
+        if pids:
+            print(f"  🔪 Killing related processes (PIDs: {', '.join(pids)})")
+            self.run_command(['kill', '-TERM', *pids], f"Terminate {len(pids)} processes")
             
-            if result.returncode == 0 and result.stdout.strip():
-                pids = result.stdout.strip().split('\n')
-                for pid in pids:
-                    if pid.strip():
-                        print(f"  🔪 Killing process: {process_name} (PID: {pid})")
-                        self.run_command(f"kill -TERM {pid}", f"Terminate PID {pid}")
-                        killed_any = True
-        
-        if killed_any:
             print("  ⏳ Waiting for processes to terminate...")
             time.sleep(2)
             
             # Force kill any remaining processes
-            for process_name in self.process_names:
-                find_cmd = f"pgrep -f {process_name}"
-                result = subprocess.run(find_cmd, shell=True, capture_output=True, text=True)
-                if result.returncode == 0 and result.stdout.strip():
-                    pids = result.stdout.strip().split('\n')
-                    for pid in pids:
-                        if pid.strip():
-                            print(f"  💥 Force killing: {process_name} (PID: {pid})")
-                            self.run_command(f"kill -KILL {pid}", f"Force kill PID {pid}")
+            remaining = self.find_related_pids()
+            if remaining:
+                print(f"  💥 Force killing (PIDs: {', '.join(remaining)})")
+                self.run_command(['kill', '-KILL', *remaining], f"Force kill {len(remaining)} processes")
         else:
             print("  ✅ No related processes found")
     
@@ -166,7 +196,7 @@ class CameraSystemCleanup:
         for shm_file in self.shared_memory_files:
             if os.path.exists(shm_file):
                 print(f"  🗑️  Removing shared memory file: {shm_file}")
-                self.run_command(f"rm {shm_file}", f"Remove {shm_file}")
+                self.remove_path(shm_file, f"Remove {shm_file}")
                 cleaned_any = True
             else:
                 print(f"  ⚪ File not found: {shm_file}")
@@ -190,15 +220,15 @@ class CameraSystemCleanup:
         
         cleaned_any = False
         for config_path in old_configs:
-            full_path = self.project_root / config_path if not config_path.startswith('/') else Path(config_path)
+            full_path = Path(config_path) if os.path.isabs(config_path) else self.project_root / config_path
             
             if full_path.exists():
                 if full_path.is_file():
                     print(f"  🗑️  Removing old config file: {full_path}")
-                    self.run_command(f"rm {full_path}", f"Remove {full_path}")
+                    self.remove_path(full_path, f"Remove {full_path}")
                 elif full_path.is_dir():
                     print(f"  🗑️  Removing old config directory: {full_path}")
-                    self.run_command(f"rm -rf {full_path}", f"Remove {full_path}")
+                    self.remove_path(full_path, f"Remove {full_path}")
                 cleaned_any = True
             else:
                 print(f"  ⚪ Config not found: {full_path}")
@@ -223,13 +253,13 @@ class CameraSystemCleanup:
                     # Keep current log, remove old ones
                     for log_file in log_dir.glob("*.log.*"):  # Rotated logs
                         print(f"  🗑️  Removing old log: {log_file}")
-                        self.run_command(f"rm {log_file}", f"Remove {log_file}")
+                        self.remove_path(log_file, f"Remove {log_file}")
                         cleaned_any = True
                 else:
                     # Remove all logs
                     for log_file in log_dir.glob("*.log*"):
                         print(f"  🗑️  Removing log: {log_file}")
-                        self.run_command(f"rm {log_file}", f"Remove {log_file}")
+                        self.remove_path(log_file, f"Remove {log_file}")
                         cleaned_any = True
         
         if not cleaned_any:
@@ -239,13 +269,17 @@ class CameraSystemCleanup:
         """Clean up Python cache files."""
         self.print_section("CLEANING UP PYTHON CACHE")
         
-        # Find and remove __pycache__ directories
-        cache_dirs = list(self.project_root.rglob("__pycache__"))
+        # Find __pycache__ directories, pruning trees that never hold Python code
+        cache_dirs = []
+        for root, dirs, _ in os.walk(self.project_root):
+            if '__pycache__' in dirs:
+                cache_dirs.append(Path(root) / '__pycache__')
+            dirs[:] = [d for d in dirs if d not in PYCACHE_PRUNE_DIRS]
         
         if cache_dirs:
             for cache_dir in cache_dirs:
                 print(f"  🗑️  Removing cache: {cache_dir}")
-                self.run_command(f"rm -rf {cache_dir}", f"Remove {cache_dir}")
+                self.remove_path(cache_dir, f"Remove {cache_dir}")
         else:
             print("  ✅ No Python cache to clean")
     
@@ -256,22 +290,12 @@ class CameraSystemCleanup:
         issues = []
         
         # Check for active services
-        for service in self.systemd_services:
-            result = subprocess.run(
-                f"systemctl is-active {service}",
-                shell=True, capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                issues.append(f"Service still active: {service}")
+        for service in self.get_active_services():
+            issues.append(f"Service still active: {service}")
         
         # Check for running processes
-        for process_name in self.process_names:
-            result = subprocess.run(
-                f"pgrep -f {process_name}",
-                shell=True, capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                issues.append(f"Process still running: {process_name}")
+        for pid in self.find_related_pids():
+            issues.append(f"Process still running: PID {pid}")
         
         # Check for shared memory files
         for shm_file in self.shared_memory_files:
@@ -279,9 +303,8 @@ class CameraSystemCleanup:
                 issues.append(f"Shared memory file exists: {shm_file}")
         
         if issues:
-            print("  ⚠️  Issues found:")
-            for issue in issues:
-                print(f"    - {issue}")
+            # Emit the whole report with a single write
+            print("  ⚠️  Issues found:", *(f"    - {issue}" for issue in issues), sep='\n')
             return False
         else:
             print("  ✅ System is clean and ready")
@@ -304,9 +327,8 @@ class CameraSystemCleanup:
 
 
 def start_camera_service(with_monitor=False):
-    """Start the camera service after cleanup."""
-    print("\n🚀 STARTING CAMERA SERVICE")
-    print("=" * 60)
+    """Start the camera service after cleanup, replacing this process."""
+    print(f"\n🚀 STARTING CAMERA SERVICE\n{SECTION_RULE}")
     
     os.chdir(project_root)
     
@@ -318,18 +340,14 @@ def start_camera_service(with_monitor=False):
         cmd = [sys.executable, "bin/start_camera_with_monitor.py"]
     
     try:
-        print(f"  → Command: {' '.join(cmd)}")
-        print("  → Press Ctrl+C to stop")
-        print("=" * 60)
+        print(f"  → Command: {' '.join(cmd)}\n  → Press Ctrl+C to stop\n{SECTION_RULE}")
+        sys.stdout.flush()
         
-        # Start the service
-        process = subprocess.Popen(cmd)
-        process.wait()
+        # Nothing is left to do here once cleanup is done, so hand the process over
+        # to the service instead of keeping an idle parent waiting on it
+        os.execv(sys.executable, cmd)
         
-    except KeyboardInterrupt:
-        print("\n  🛑 Service stopped by user")
-        return 0
-    except Exception as e:
+    except OSError as e:
         print(f"\n  ❌ Error starting service: {e}")
         return 1
 
@@ -13,15 +13,12 @@ Date: May 29, 2025
 
 import os
 import sys
-import time
-import signal
 import logging
 from pathlib import Path
 
 # Dynamic path detection
 script_path = Path(__file__).resolve()
 project_root = script_path.parent.parent
-bin_dir = script_path.parent
 
 # Change to project root for consistent operation
 os.chdir(project_root)
@@ -36,36 +33,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger('imx296_main')
 
-# Global capture instance for signal handling
-capture_instance = None
-
-
-def signal_handler(sig, frame):
-    """Handle shutdown signals gracefully."""
-    global capture_instance
-    
-    logger.info(f"Received signal {sig}, shutting down...")
-    
-    if capture_instance:
-        try:
-            capture_instance.cleanup()
-        except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
-    
-    sys.exit(0)
-
-
 def main():
     """Main entry point."""
-    global capture_instance
-    
-    # Register signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
+    # Signal handling is owned by the capture system's main(), which cleans up
+    # on the main thread once a shutdown signal has been flagged
     logger.info("Enhanced IMX296 Camera Capture System")
-    logger.info(f"Project root: {project_root}")
-    logger.info(f"Working directory: {os.getcwd()}")
+    logger.info("Project root: %s", project_root)
+    logger.info("Working directory: %s", os.getcwd())
     
     try:
         # Import and run the main capture system
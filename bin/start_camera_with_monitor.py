@@ -13,30 +13,37 @@ Date: December 2024
 import os
 import sys
 import time
-import signal
+import curses
 import argparse
+import selectors
 import subprocess
-import threading
 from pathlib import Path
 
 # Add project root to Python path
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
-def start_camera_service():
-    """Start the IMX296 camera service."""
+from bin.status_monitor import CameraStatusMonitor, wait_for_status_file
+
+OUTPUT_POLL_INTERVAL = 0.5  # Seconds between monitor exit checks while relaying output
+OUTPUT_READ_SIZE = 65536    # Bytes read from the camera output per ready event
+
+# Where the camera service's stdout/stderr go while the monitor runs in-process
+SERVICE_OUTPUT_FILE = project_root / "logs" / "camera_service.out"
+
+def start_camera_service(stdout=None):
+    """Start the IMX296 camera service, sending its output to stdout (inherited by default)."""
     print("Starting IMX296 camera service...")
     
-    # Change to project directory
-    os.chdir(project_root)
-    
-    # Start the camera service
+    # Start the camera service from the project directory (so "-m src...."
+    # resolves) without changing this launcher's own working directory
     camera_cmd = [sys.executable, "-m", "src.imx296_gs_capture.imx296_capture"]
     camera_process = subprocess.Popen(
         camera_cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True
+        cwd=str(project_root),
+        stdout=stdout,
+        stderr=subprocess.STDOUT if stdout is not None else None,
+        bufsize=0
     )
     
     return camera_process
@@ -58,16 +65,62 @@ def start_status_monitor():
     
     return monitor_process
 
-def monitor_camera_output(camera_process):
-    """Monitor camera service output in background."""
-    def output_reader():
-        for line in iter(camera_process.stdout.readline, ''):
-            if line:
-                print(f"[CAMERA] {line.strip()}")
-    
-    thread = threading.Thread(target=output_reader, daemon=True)
-    thread.start()
-    return thread
+def run_status_monitor():
+    """Run the status monitor in this process, without starting another interpreter."""
+    print("Starting status monitor...")
+    curses.wrapper(CameraStatusMonitor().run)
+
+def relay_camera_output(camera_process, monitor_process):
+    """Prefix camera service output until the monitor exits, without a reader thread."""
+    fd = camera_process.stdout.fileno()
+    os.set_blocking(fd, False)
+    
+    pending = b''
+    
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        
+        while monitor_process.poll() is None:
+            if not selector.select(timeout=OUTPUT_POLL_INTERVAL):
+                continue
+            
+            data = os.read(fd, OUTPUT_READ_SIZE)
+            if not data:
+                # Camera service closed its output; relay its unterminated last
+                # line, then just wait for the monitor
+                write_camera_lines([pending])
+                monitor_process.wait()
+                break
+            
+            # Keep any partial trailing line for the next read, and write the
+            # complete ones in a single call
+            *lines, pending = (pending + data).split(b'\n')
+            write_camera_lines(lines)
+
+def write_camera_lines(lines):
+    """Write non-blank camera output lines with the [CAMERA] prefix in one call."""
+    out = b''.join(b"[CAMERA] " + line.strip() + b"\n" for line in lines if line.strip())
+    if out:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(out)
+        sys.stdout.buffer.flush()
+
+def stop_processes(processes):
+    """Terminate (process, name, timeout) entries together, then wait on each within its timeout."""
+    running = [(p, name, timeout) for p, name, timeout in processes if p and p.poll() is None]
+    
+    # Signal everything first so the shutdowns overlap instead of queueing
+    for process, name, _ in running:
+        print(f"Stopping {name}...")
+        process.terminate()
+    
+    start = time.monotonic()
+    for process, _, timeout in running:
+        try:
+            process.wait(timeout=max(0, start + timeout - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
 
 def main():
     """Main launcher function."""
@@ -79,6 +132,7 @@ Examples:
   %(prog)s                    # Start service only
   %(prog)s --monitor         # Start service with status monitor
   %(prog)s --monitor-only    # Start status monitor only (camera service must already be running)
+  %(prog)s --monitor --separate-monitor  # Run the monitor as its own process and show camera output
   %(prog)s --help           # Show this help
         """
     )
@@ -98,7 +152,14 @@ Examples:
     parser.add_argument(
         '--no-output', '-q',
         action='store_true',
-        help='Suppress camera service output when using monitor'
+        help='Discard camera service output instead of relaying it (--separate-monitor) '
+             'or writing it to logs/camera_service.out'
+    )
+    
+    parser.add_argument(
+        '--separate-monitor', '-s',
+        action='store_true',
+        help='Run the status monitor as a separate process instead of inside this launcher'
     )
     
     args = parser.parse_args()
@@ -106,7 +167,6 @@ Examples:
     # Handle different launch modes
     camera_process = None
     monitor_process = None
-    output_thread = None
     
     try:
         if args.monitor_only:
@@ -118,8 +178,11 @@ Examples:
             print("Press Ctrl+C to exit")
             print("=" * 60)
             
-            monitor_process = start_status_monitor()
-            monitor_process.wait()
+            if args.separate_monitor:
+                monitor_process = start_status_monitor()
+                monitor_process.wait()
+            else:
+                run_status_monitor()
             
         elif args.monitor:
             # Start both service and monitor
@@ -130,21 +193,33 @@ Examples:
             print("Press Ctrl+C to stop both")
             print("=" * 60)
             
-            # Start camera service
-            camera_process = start_camera_service()
-            
-            # Give camera service time to start
-            time.sleep(3)
+            # Start camera service, piping its output only if we will relay it.
+            # An in-process monitor owns the terminal, so output would garble
+            # it; it goes to a file instead, which also keeps startup errors
+            # raised before the service's own logging is set up.
+            relay_output = args.separate_monitor and not args.no_output
+            if args.no_output:
+                camera_process = start_camera_service(subprocess.DEVNULL)
+            elif relay_output:
+                camera_process = start_camera_service(subprocess.PIPE)
+            else:
+                SERVICE_OUTPUT_FILE.parent.mkdir(exist_ok=True)
+                print(f"Camera service output: {SERVICE_OUTPUT_FILE}")
+                with open(SERVICE_OUTPUT_FILE, 'ab') as service_output:
+                    camera_process = start_camera_service(service_output)
             
-            if not args.no_output:
-                # Monitor camera output in background
-                output_thread = monitor_camera_output(camera_process)
+            # Give camera service up to 3s to start, but only until its status appears
+            wait_for_status_file(3.0)
             
-            # Start status monitor
-            monitor_process = start_status_monitor()
-            
-            # Wait for monitor to finish (user pressed 'q' or Ctrl+C)
-            monitor_process.wait()
+            # Run status monitor until the user presses 'q' or Ctrl+C
+            if not args.separate_monitor:
+                run_status_monitor()
+            else:
+                monitor_process = start_status_monitor()
+                if relay_output:
+                    relay_camera_output(camera_process, monitor_process)
+                else:
+                    monitor_process.wait()
             
         else:
             # Start just the camera service
@@ -168,21 +243,10 @@ Examples:
     
     finally:
         # Clean up processes
-        if monitor_process and monitor_process.poll() is None:
-            print("Stopping status monitor...")
-            monitor_process.terminate()
-            try:
-                monitor_process.wait(timeout=3)
-            except subprocess.TimeoutExpired:
-                monitor_process.kill()
-        
-        if camera_process and camera_process.poll() is None:
-            print("Stopping camera service...")
-            camera_process.terminate()
-            try:
-                camera_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                camera_process.kill()
+        stop_processes([
+            (monitor_process, "status monitor", 3),
+            (camera_process, "camera service", 5),
+        ])
         
         print("Shutdown complete.")
     
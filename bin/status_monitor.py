@@ -17,33 +17,107 @@ import json
 import time
 import curses
 import datetime
-import threading
-from pathlib import Path
-from typing import Dict, Any, Optional
+import functools
+from typing import Dict, Any
 
 # Status file location in shared memory
 STATUS_FILE = "/dev/shm/imx296_status.json"
 UPDATE_INTERVAL = 1.0  # Update every 1 second
 
+STATUS_WAIT_POLL = 0.05  # Poll interval while waiting for the status file
+STATUS_READ_SIZE = 4096  # Minimum read size for the status file
+
+# Color pair numbers for good (running/connected) and bad states
+COLOR_PAIR_OK = 1
+COLOR_PAIR_ALERT = 2
+
+# Every possible buffer utilization bar, indexed by filled cell count
+BAR_WIDTH = 40
+PROGRESS_BARS = tuple(f"[{'█' * filled}{'░' * (BAR_WIDTH - filled)}]" for filled in range(BAR_WIDTH + 1))
+
+
+@functools.lru_cache(maxsize=128)
+def format_datetime(timestamp: int) -> str:
+    """Format a whole-second timestamp as local date and time."""
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@functools.lru_cache(maxsize=128)
+def format_clock(timestamp: int) -> str:
+    """Format a whole-second timestamp as local time of day."""
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+
+
+def wait_for_status_file(timeout: float) -> bool:
+    """Wait until the status file appears, returning as soon as it does."""
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(STATUS_FILE):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(STATUS_WAIT_POLL)
+    return True
+
+
 class CameraStatusMonitor:
     """Terminal UI status monitor for IMX296 camera service."""
     
+    # Trigger type names, indexed by trigger type (0=none, 1=keyboard, 2=ntfy)
+    TRIGGER_NAMES = ("None", "Keyboard", "ntfy")
+    
     def __init__(self):
         self.running = False
         self.status_data = {}
         self.last_update = 0
         self.start_time = time.time()
         
+        # Last parsed status, keyed on (path, mtime_ns, size) of the file it came from
+        self._cached_status = None
+        self._cached_key = None
+        self._default_status = None
+        
+        # Status dict last drawn in full, and (draw function, start, end) rows
+        # of the sections that change with the clock
+        self._drawn_status = None
+        self._full_redraw = True
+        self._dynamic_sections = []
+        self._content_end = 0  # Row below the last section, for the footer overlap check
+        
+        # Attributes for good/bad states; replaced by color pairs in run() when
+        # the terminal has colors, so blinking is only the monochrome fallback
+        self.ok_attr = curses.A_BOLD
+        self.alert_attr = curses.A_BOLD | curses.A_BLINK
+        
     def load_status(self) -> Dict[str, Any]:
-        """Load status data from shared memory file."""
+        """Load status data from shared memory file, re-parsing only when it changed."""
         try:
-            if os.path.exists(STATUS_FILE):
-                with open(STATUS_FILE, 'r') as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, IOError, OSError):
+            st = os.stat(STATUS_FILE)
+            key = (STATUS_FILE, st.st_mtime_ns, st.st_size)
+            if key == self._cached_key:
+                return self._cached_status
+            
+            # Status lives on tmpfs and is replaced atomically, so one raw read
+            # of the stat'd size gets the whole file
+            fd = os.open(STATUS_FILE, os.O_RDONLY | os.O_CLOEXEC)
+            try:
+                data = os.read(fd, max(st.st_size, STATUS_READ_SIZE))
+            finally:
+                os.close(fd)
+            status = json.loads(data)
+            
+            self._cached_status = status
+            self._cached_key = key
+            return status
+        except (json.JSONDecodeError, OSError):
             pass
         
-        # Return default status if file doesn't exist or can't be read
+        # Return default status if file doesn't exist or can't be read, built
+        # once so an absent service doesn't look like a status change every tick
+        if self._default_status is None:
+            self._default_status = self._build_default_status()
+        return self._default_status
+    
+    def _build_default_status(self) -> Dict[str, Any]:
+        """Build the status shown when no service status is available."""
         return {
             'service_running': False,
             'uptime': 0,
@@ -108,12 +182,13 @@ class CameraStatusMonitor:
     
     def get_trigger_type_name(self, trigger_type: int) -> str:
         """Get human-readable trigger type name."""
-        trigger_names = {0: "None", 1: "Keyboard", 2: "ntfy"}
-        return trigger_names.get(trigger_type, "Unknown")
+        if 0 <= trigger_type < len(self.TRIGGER_NAMES):
+            return self.TRIGGER_NAMES[trigger_type]
+        return "Unknown"
     
     def draw_header(self, stdscr, y_pos: int) -> int:
         """Draw the header section."""
-        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        current_time = format_datetime(int(time.time()))
         monitor_uptime = time.time() - self.start_time
         
         stdscr.addstr(y_pos, 0, "═" * 80, curses.A_BOLD)
@@ -139,7 +214,7 @@ class CameraStatusMonitor:
         
         # Service status
         status_text = "RUNNING" if service_running else "STOPPED"
-        status_color = curses.A_BOLD if service_running else curses.A_BOLD | curses.A_BLINK
+        status_color = self.ok_attr if service_running else self.alert_attr
         
         stdscr.addstr(y_pos, 0, "SERVICE STATUS: ", curses.A_BOLD)
         stdscr.addstr(y_pos, 16, status_text, status_color)
@@ -160,7 +235,7 @@ class CameraStatusMonitor:
         # Connection status
         connected = lsl_status.get('connected', False)
         conn_text = "CONNECTED" if connected else "DISCONNECTED"
-        conn_color = curses.A_NORMAL if connected else curses.A_BLINK
+        conn_color = self.ok_attr if connected else self.alert_attr
         
         stdscr.addstr(y_pos, 2, f"Status: {conn_text}", conn_color)
         stdscr.addstr(y_pos, 25, f"Rate: {lsl_status.get('samples_per_second', 0):.1f} Hz")
@@ -207,10 +282,8 @@ class CameraStatusMonitor:
         y_pos += 1
         
         # Progress bar for buffer utilization
-        bar_width = 40
-        filled = int(bar_width * utilization / 100)
-        bar = "█" * filled + "░" * (bar_width - filled)
-        stdscr.addstr(y_pos, 2, f"[{bar}]")
+        filled = min(max(int(BAR_WIDTH * utilization / 100), 0), BAR_WIDTH)
+        stdscr.addstr(y_pos, 2, PROGRESS_BARS[filled])
         y_pos += 2
         
         return y_pos
@@ -277,8 +350,7 @@ class CameraStatusMonitor:
         y_pos += 1
         
         if last_trigger_time > 0:
-            dt = datetime.datetime.fromtimestamp(last_trigger_time)
-            time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
+            time_str = format_datetime(int(last_trigger_time))
             time_ago = time.time() - last_trigger_time
             stdscr.addstr(y_pos, 2, f"Time: {time_str} ({self.format_uptime(time_ago)} ago)")
         else:
@@ -311,48 +383,78 @@ class CameraStatusMonitor:
         y_pos += 1
         
         stdscr.addstr(y_pos, 0, "Controls: 'q' = Quit, 'r' = Refresh, 'c' = Clear", curses.A_DIM)
-        stdscr.addstr(y_pos, 50, f"Last Update: {datetime.datetime.fromtimestamp(self.last_update).strftime('%H:%M:%S')}", curses.A_DIM)
+        stdscr.addstr(y_pos, 50, f"Last Update: {format_clock(int(self.last_update))}", curses.A_DIM)
         
         return y_pos
     
+    def _redraw_lines(self, stdscr, draw_section, start_y: int, end_y: int):
+        """Blank the lines a section occupies and draw it again in place."""
+        for y in range(start_y, end_y):
+            stdscr.move(y, 0)
+            stdscr.clrtoeol()
+        draw_section(stdscr, start_y)
+    
     def draw_screen(self, stdscr):
-        """Draw the complete status screen."""
+        """Draw the status screen, repainting only time-dependent lines when data is unchanged."""
         height, width = stdscr.getmaxyx()
-        stdscr.clear()
-        
-        y_pos = 0
         
         try:
-            # Draw all sections
-            y_pos = self.draw_header(stdscr, y_pos)
-            y_pos = self.draw_service_status(stdscr, y_pos)
-            y_pos = self.draw_lsl_status(stdscr, y_pos)
-            y_pos = self.draw_buffer_status(stdscr, y_pos)
-            y_pos = self.draw_recording_status(stdscr, y_pos)
-            y_pos = self.draw_trigger_status(stdscr, y_pos)
-            y_pos = self.draw_system_info(stdscr, y_pos)
+            if self._full_redraw or self.status_data is not self._drawn_status:
+                stdscr.erase()
+                
+                # Draw all sections, remembering where the time-dependent ones sit
+                header_end = self.draw_header(stdscr, 0)
+                y_pos = self.draw_service_status(stdscr, header_end)
+                y_pos = self.draw_lsl_status(stdscr, y_pos)
+                y_pos = self.draw_buffer_status(stdscr, y_pos)
+                y_pos = self.draw_recording_status(stdscr, y_pos)
+                trigger_y = y_pos
+                y_pos = self.draw_trigger_status(stdscr, y_pos)
+                self._dynamic_sections = [
+                    (self.draw_header, 0, header_end),
+                    (self.draw_trigger_status, trigger_y, y_pos),
+                ]
+                y_pos = self.draw_system_info(stdscr, y_pos)
+                self._content_end = y_pos
+                
+                self._drawn_status = self.status_data
+                self._full_redraw = False
+            else:
+                # Status unchanged: only the clocks and "ago" times move
+                for draw_section, start_y, end_y in self._dynamic_sections:
+                    self._redraw_lines(stdscr, draw_section, start_y, end_y)
+                y_pos = self._content_end
             
             # Draw footer at bottom
             footer_y = height - 2
             if footer_y > y_pos:
-                self.draw_footer(stdscr, footer_y)
+                self._redraw_lines(stdscr, self.draw_footer, footer_y, footer_y + 1)
             
         except curses.error:
             # Handle screen too small
-            stdscr.addstr(0, 0, "Terminal too small! Please resize to at least 80x25", curses.A_BLINK)
+            stdscr.erase()
+            stdscr.addstr(0, 0, "Terminal too small! Please resize to at least 80x25", self.alert_attr)
+            self._full_redraw = True
         
-        stdscr.refresh()
+        stdscr.noutrefresh()
+        curses.doupdate()
     
     def run(self, stdscr):
         """Main run loop for the status monitor."""
         # Configure curses
         curses.curs_set(0)  # Hide cursor
-        stdscr.nodelay(1)   # Non-blocking input
-        stdscr.timeout(100) # 100ms timeout for getch()
+        # getch() blocks for at most one update interval, so it doubles as the
+        # loop's sleep while still returning as soon as a key is pressed
+        stdscr.timeout(int(UPDATE_INTERVAL * 1000))
         
         # Initialize colors if available
         if curses.has_colors():
-            curses.start_colors()
+            curses.start_color()
+            curses.use_default_colors()
+            curses.init_pair(COLOR_PAIR_OK, curses.COLOR_GREEN, -1)
+            curses.init_pair(COLOR_PAIR_ALERT, curses.COLOR_RED, -1)
+            self.ok_attr = curses.color_pair(COLOR_PAIR_OK) | curses.A_BOLD
+            self.alert_attr = curses.color_pair(COLOR_PAIR_ALERT) | curses.A_BOLD
         
         self.running = True
         
@@ -369,28 +471,29 @@ class CameraStatusMonitor:
                 key = stdscr.getch()
                 if key == ord('q') or key == ord('Q'):
                     self.running = False
-                elif key == ord('r') or key == ord('R'):
+                elif key in (ord('r'), ord('R'), curses.KEY_RESIZE):
                     # Force refresh
-                    pass
+                    self._full_redraw = True
                 elif key == ord('c') or key == ord('C'):
                     # Clear screen
                     stdscr.clear()
-            except:
+                    self._full_redraw = True
+            except curses.error:
+                # getch() now blocks for the whole interval, so only curses
+                # errors are ignored here; Ctrl+C must still reach main()
                 pass
-            
-            # Sleep for update interval
-            time.sleep(UPDATE_INTERVAL)
 
 
 def main():
     """Main function to run the status monitor."""
     try:
-        # Check if status file exists
+        # Check if status file exists, giving a starting service up to 2s to write it
         if not os.path.exists(STATUS_FILE):
             print(f"Warning: Status file {STATUS_FILE} not found.")
             print("Make sure the IMX296 camera service is running.")
-            print("Starting monitor anyway...")
-            time.sleep(2)
+            print("Waiting for status file...")
+            if not wait_for_status_file(2.0):
+                print("Starting monitor anyway...")
         
         # Initialize and run monitor
         monitor = CameraStatusMonitor()
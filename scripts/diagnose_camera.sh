@@ -341,7 +341,7 @@ test_camera_capture() {
   
   # Check for Bookworm OS and set workaround
   WORKAROUND=""
-  if [ "" != "$(grep '=bookworm' /etc/os-release 2>/dev/null)" ]; then
+  if grep -q -m1 '^VERSION_CODENAME="\?bookworm"\?$' /etc/os-release 2>/dev/null; then
     echo "Detected Debian Bookworm, using --no-raw workaround"
     WORKAROUND="--no-raw"
   fi
@@ -356,7 +356,7 @@ test_camera_capture() {
   echo "Trying capture with matched approach from working script..."
   
   # Check if this is a Pi5 (revision ending with 17 or similar)
-  if [ "" != "$(grep "Revision.*: ...17.$" /proc/cpuinfo)" ]; then
+  if grep -q -m1 "^Revision[[:space:]]*: ...17.$" /proc/cpuinfo; then
     echo "Detected Raspberry Pi 5, using rpicam-vid for capture..."
     
     # Use rpicam-vid for Pi5
@@ -483,7 +483,7 @@ fix_media_ctl_roi() {
   
   # Determine the device ID based on Raspberry Pi revision
   local DEVICE_ID="10"
-  if [ "" != "$(grep "Revision.*: ...17.$" /proc/cpuinfo)" ]; then
+  if grep -q -m1 "^Revision[[:space:]]*: ...17.$" /proc/cpuinfo; then
     DEVICE_ID="10"  # Default to 10 for first camera
     if [ -n "$CAM1" ]; then  # Check for CAM1 env var that may be set
       DEVICE_ID="11"
@@ -1047,7 +1047,7 @@ configure_enhanced_imx296_camera() {
     
     # Load IMX296 module if available
     if modinfo imx296 >/dev/null 2>&1; then
-        if ! lsmod | grep -q "imx296"; then
+        if ! grep -q "^imx296 " /proc/modules; then
             log_info "Loading IMX296 camera module..."
             modprobe imx296 || log_warn "Failed to load imx296 module"
         else
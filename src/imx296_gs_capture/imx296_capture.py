@@ -18,40 +18,23 @@ import time
 import threading
 import subprocess
 import logging
+import logging.handlers
 import queue
+import atexit
 import datetime
 import signal
 import re
 import collections
 import json
+import shutil
 from pathlib import Path
-from typing import Dict, Any, Optional
-import glob
-
-# Optional system monitoring
-try:
-    import psutil
-    PSUTIL_AVAILABLE = True
-except ImportError:
-    psutil = None
-    PSUTIL_AVAILABLE = False
+from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to Python path - dynamic detection from actual file location
 project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-# Change working directory to project root for consistent file access
-original_cwd = os.getcwd()
-os.chdir(project_root)
-
-# Log the dynamic paths for debugging
-if __name__ == "__main__":
-    print(f"Dynamic path detection:")
-    print(f"  Script location: {Path(__file__).resolve()}")
-    print(f"  Project root: {project_root}")
-    print(f"  Working directory: {os.getcwd()}")
-    print(f"  Original CWD: {original_cwd}")
-
 try:
     import pylsl
     LSL_AVAILABLE = True
@@ -59,21 +42,27 @@ except ImportError:
     pylsl = None
     LSL_AVAILABLE = False
 
-try:
-    import yaml
-except ImportError:
-    yaml = None
-
 from .ntfy_handler import NtfyHandler
 from .video_recorder import VideoRecorder
 
 # Global variables for threading coordination
 stop_event = threading.Event()
+shutdown_event = threading.Event()  # Set by signal handlers; only the main thread acts on it
 frame_queue = queue.Queue()
 
 # Status file for monitoring
 STATUS_FILE = "/dev/shm/imx296_status.json"
 
+# Upper bound on concurrent media-ctl probes during camera auto-detection
+MAX_PROBE_WORKERS = 8
+
+# Last successful auto-detection, reused on quick restarts to skip re-probing
+DETECTION_CACHE_FILE = "/dev/shm/imx296_detection.json"
+DETECTION_CACHE_TTL = 30  # seconds
+
+# Case-insensitive sensor match applied to raw media-ctl output bytes
+IMX296_PATTERN = re.compile(rb'imx296', re.IGNORECASE)
+
 class GSCropCameraCapture:
     """
     GScrop-based camera capture with LSL integration and enhanced simplified approach.
@@ -139,6 +128,7 @@ class GSCropCameraCapture:
         self.buffer_thread = None
         
         # Auto-detect camera if enabled
+        self.imx296_media_device = None  # Media node confirmed to carry the IMX296 entity
         if config['camera'].get('auto_detect', True):
             self._auto_detect_camera()
         
@@ -161,7 +151,7 @@ class GSCropCameraCapture:
                 )
                 self.logger.info("ntfy handler initialized")
             except Exception as e:
-                self.logger.warning(f"Failed to initialize ntfy handler: {e}")
+                self.logger.warning("Failed to initialize ntfy handler: %s", e)
         
         # Initialize video recorder (independent mode)
         recording_config = self.config.get('recording', {})
@@ -172,7 +162,7 @@ class GSCropCameraCapture:
                 self.video_recorder = VideoRecorder(full_recording_config)
                 self.logger.info("Video recorder initialized")
             except Exception as e:
-                self.logger.warning(f"Failed to initialize video recorder: {e}")
+                self.logger.warning("Failed to initialize video recorder: %s", e)
         
         # Start rolling buffer immediately
         self.start_rolling_buffer()
@@ -180,114 +170,210 @@ class GSCropCameraCapture:
         # Start status reporting
         self._start_status_reporting()
         
-        self.logger.info(f"Enhanced GScrop camera capture initialized: {self.width}x{self.height}@{self.fps}fps")
+        self.logger.info("Enhanced GScrop camera capture initialized: %sx%s@%sfps", self.width, self.height, self.fps)
     
     def _find_gscrop_script(self):
         """Find the GScrop script using the proven approach from simple_camera_lsl.py."""
-        # Enhanced: Search multiple locations dynamically
-        script_locations = [
-            # Project root relative paths
-            project_root / "bin" / "GScrop",
-            project_root / "GScrop",
-            # Current directory relative paths
-            Path("./bin/GScrop"),
-            Path("./GScrop"),
-            # Config-specified path
-            Path(self.config['camera'].get('script_path', 'bin/GScrop'))
-        ]
-        
-        for script_path in script_locations:
-            if script_path.exists() and os.access(script_path, os.X_OK):
-                self.logger.info(f"Found GScrop script at: {script_path}")
-                return str(script_path)
+        # Explicit override for deployments that keep GScrop elsewhere
+        override_path = os.environ.get('IMX296_GSCROP')
+        if override_path and os.access(override_path, os.X_OK):
+            self.logger.info("Using GScrop script from IMX296_GSCROP: %s", override_path)
+            return override_path
+        
+        # Enhanced: Search project root and current directory locations in one lookup
+        search_path = os.pathsep.join([
+            str(project_root / "bin"),
+            str(project_root),
+            "bin",
+            ".",
+        ])
+        script_path = shutil.which("GScrop", path=search_path)
+        
+        # Config-specified path
+        if not script_path:
+            configured_path = self.config['camera'].get('script_path', 'bin/GScrop')
+            if os.access(configured_path, os.X_OK) and os.path.isfile(configured_path):
+                script_path = configured_path
+        
+        if script_path:
+            self.logger.info("Found GScrop script at: %s", script_path)
+            return script_path
         
         # Default fallback
         default_path = str(project_root / "bin" / "GScrop")
-        self.logger.warning(f"GScrop script not found, using default: {default_path}")
+        self.logger.warning("GScrop script not found, using default: %s", default_path)
         return default_path
     
-    def _auto_detect_camera(self):
-        """Auto-detect camera configuration with unlimited device support using glob.glob."""
-        import glob
+    def _list_media_devices(self):
+        """List /dev/mediaN nodes in numeric order using a single directory read."""
+        try:
+            with os.scandir('/dev') as entries:
+                # Skip non-numeric devices with smart filtering
+                media_devices = [
+                    entry.path for entry in entries
+                    if entry.name.startswith('media') and entry.name[5:].isdigit()
+                ]
+        except OSError as e:
+            self.logger.warning("Unable to scan /dev for media devices: %s", e)
+            return []
         
+        # Sort numerically so /dev/media10 follows /dev/media9
+        media_devices.sort(key=lambda path: int(path[len('/dev/media'):]))
+        return media_devices
+    
+    def _auto_detect_camera(self):
+        """Auto-detect camera configuration with unlimited device support using os.scandir."""
         self.logger.info("Auto-detecting IMX296 camera with unlimited device support...")
         
-        # Dynamic search using glob for unlimited device support
-        media_devices = glob.glob('/dev/media*')
-        media_devices.sort()  # Sort for consistent ordering
+        # Reuse a fresh result from a recent run - the hardware does not change between quick restarts
+        cached_device = self._load_detection_cache()
+        if cached_device:
+            self.detected_device = cached_device
+            self.imx296_media_device = cached_device
+            self.logger.info("Auto-detection cached: Using %s", cached_device)
+            return cached_device
         
-        self.logger.info(f"Scanning {len(media_devices)} media devices: {media_devices}")
+        # Dynamic search of /dev for unlimited device support
+        media_devices = self._list_media_devices()
+        
+        self.logger.info("Scanning %s media devices: %s", len(media_devices), media_devices)
         
         detected_device = None
         detected_entity = None
         
-        for device_path in media_devices:
-            # Skip non-numeric devices with smart filtering
-            try:
-                device_num = int(device_path.split('media')[-1])
-                self.logger.debug(f"Testing device: {device_path} (device number: {device_num})")
-            except ValueError:
-                self.logger.debug(f"Skipping non-numeric device: {device_path}")
-                continue
-            
-            # Test each device for IMX296 compatibility
-            if self._test_imx296_device(device_path):
-                detected_device = device_path
-                self.logger.info(f"✅ IMX296 found on {device_path}")
-                break
-            else:
-                self.logger.debug(f"❌ No IMX296 found on {device_path}")
+        # Resolve media-ctl once rather than failing an exec for every device
+        self.media_ctl_path = self._find_media_ctl()
+        if media_devices and not self.media_ctl_path:
+            self.logger.warning("❌ media-ctl not found - cannot validate devices")
+        elif media_devices and self._imx296_in_sysfs() is False:
+            # The kernel has no IMX296 sub-device registered, so no media-ctl probe can succeed
+            self.logger.warning("❌ No IMX296 sensor registered in /sys/class/video4linux - skipping media-ctl probes")
+        elif media_devices:
+            # Probe all devices concurrently - media-ctl is I/O bound, so the scan
+            # takes as long as the slowest device instead of the sum of all of them.
+            # Results are consumed in device order so the lowest matching node wins.
+            with ThreadPoolExecutor(max_workers=min(len(media_devices), MAX_PROBE_WORKERS)) as executor:
+                probe_results = executor.map(self._test_imx296_device, media_devices)
+                for device_path, has_imx296 in zip(media_devices, probe_results):
+                    if has_imx296:
+                        detected_device = device_path
+                        self.logger.info("✅ IMX296 found on %s", device_path)
+                        break
+                    else:
+                        self.logger.debug("❌ No IMX296 found on %s", device_path)
         
         if detected_device:
             self.detected_device = detected_device
-            self.logger.info(f"Auto-detection successful: Using {detected_device}")
+            self.imx296_media_device = detected_device
+            self.logger.info("Auto-detection successful: Using %s", detected_device)
+            self._save_detection_cache(detected_device)
             return detected_device
         else:
             self.logger.warning("⚠️  No IMX296 devices found in comprehensive scan")
+            self._clear_detection_cache()
             # Fallback to first available device
             if media_devices:
                 fallback_device = media_devices[0]
                 self.detected_device = fallback_device
-                self.logger.warning(f"Falling back to: {fallback_device}")
+                self.logger.warning("Falling back to: %s", fallback_device)
                 return fallback_device
             else:
                 self.logger.error("❌ No media devices found at all")
                 return None
 
+    def _load_detection_cache(self):
+        """Return the cached IMX296 media device if it is recent and still present."""
+        try:
+            with open(DETECTION_CACHE_FILE, 'r') as f:
+                cache = json.load(f)
+            device = cache['device']
+            if time.time() - cache['timestamp'] < DETECTION_CACHE_TTL and os.path.exists(device):
+                return device
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+    
+    def _save_detection_cache(self, device_path):
+        """Record a successful auto-detection for quick restarts."""
+        try:
+            # Write to a temp file and rename it into place so a concurrent
+            # start never reads a half-written cache
+            tmp_file = DETECTION_CACHE_FILE + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump({'device': device_path, 'timestamp': time.time()}, f)
+            os.replace(tmp_file, DETECTION_CACHE_FILE)
+        except OSError as e:
+            self.logger.debug("Could not write detection cache: %s", e)
+    
+    def _clear_detection_cache(self):
+        """Forget the cached detection so a moved or missing sensor is re-probed next time."""
+        try:
+            os.unlink(DETECTION_CACHE_FILE)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.debug("Could not remove detection cache: %s", e)
+    
+    def _imx296_in_sysfs(self):
+        """Check the V4L2 device names in sysfs for an IMX296 sensor without spawning anything.
+        
+        Returns True/False when sysfs could be read, None when it is unavailable.
+        """
+        sysfs_dir = '/sys/class/video4linux'
+        try:
+            with os.scandir(sysfs_dir) as entries:
+                device_dirs = [entry.path for entry in entries]
+        except OSError:
+            return None
+        
+        for device_dir in device_dirs:
+            try:
+                with open(os.path.join(device_dir, 'name'), 'r') as f:
+                    if 'imx296' in f.read().lower():
+                        self.logger.debug("✅ IMX296 sensor registered as %s", os.path.basename(device_dir))
+                        return True
+            except OSError:
+                continue
+        
+        return False
+    
+    def _find_media_ctl(self):
+        """Locate the media-ctl binary, preferring the configured system path."""
+        configured_path = self.config.get('system', {}).get('media_ctl_path')
+        if configured_path and os.access(configured_path, os.X_OK):
+            return configured_path
+        return shutil.which('media-ctl')
+    
     def _test_imx296_device(self, device_path):
         """Test if a media device has IMX296 camera - enhanced validation."""
         try:
-            import subprocess
-            
             # Use media-ctl to probe the device for IMX296 entity
             result = subprocess.run(
-                ['media-ctl', '-d', device_path, '-p'],
+                [self.media_ctl_path, '-d', device_path, '-p'],
                 capture_output=True,
-                text=True,
                 timeout=5
             )
             
             if result.returncode == 0:
-                # Look for IMX296 entity in the output
-                output = result.stdout.lower()
-                if 'imx296' in output:
-                    self.logger.debug(f"✅ IMX296 entity found on {device_path}")
+                # Look for IMX296 entity in the output without decoding it
+                if IMX296_PATTERN.search(result.stdout):
+                    self.logger.debug("✅ IMX296 entity found on %s", device_path)
                     return True
                 else:
-                    self.logger.debug(f"❌ No IMX296 entity on {device_path}")
+                    self.logger.debug("❌ No IMX296 entity on %s", device_path)
                     return False
             else:
-                self.logger.debug(f"❌ Failed to probe {device_path}: {result.stderr}")
+                self.logger.debug("❌ Failed to probe %s: %s", device_path, result.stderr.decode(errors='replace'))
                 return False
                 
         except subprocess.TimeoutExpired:
-            self.logger.debug(f"❌ Timeout probing {device_path}")
+            self.logger.debug("❌ Timeout probing %s", device_path)
             return False
         except FileNotFoundError:
             self.logger.debug("❌ media-ctl not found - cannot validate devices")
             return False
-        except Exception as e:
-            self.logger.debug(f"❌ Error testing {device_path}: {e}")
+        except (OSError, subprocess.SubprocessError) as e:
+            self.logger.debug("❌ Error testing %s: %s", device_path, e)
             return False
     
     def _setup_lsl_proven(self):
@@ -336,7 +422,7 @@ class GSCropCameraCapture:
             
             # Create outlet with minimal buffering for real-time streaming
             self.lsl_outlet = pylsl.StreamOutlet(info, chunk_size=1, max_buffered=0)
-            self.logger.info(f"LSL outlet '{name}' created successfully (enhanced 3-channel)")
+            self.logger.info("LSL outlet '%s' created successfully (enhanced 3-channel)", name)
             self.logger.info("IMPORTANT: LSL configured for 3-CHANNEL streaming - frame_number, trigger_time, trigger_type")
             
         except Exception as e:
@@ -370,9 +456,9 @@ class GSCropCameraCapture:
             
             # Periodic debug logging to avoid spam
             if frame_num % 100 == 0:
-                self.logger.debug(f"Queued frame {frame_num} from {source}")
+                self.logger.debug("Queued frame %s from %s", frame_num, source)
         except queue.Full:
-            self.logger.warning(f"Frame queue full, dropping frame {frame_num}")
+            self.logger.warning("Frame queue full, dropping frame %s", frame_num)
         except Exception as e:
             self.logger.error(f"Failed to queue frame {frame_num} from {source}: {e}")
     
@@ -412,7 +498,7 @@ class GSCropCameraCapture:
                     
                     if window_duration > 0:
                         current_fps = (window_frames - 1) / window_duration
-                        self.logger.debug(f"Enhanced LSL processing: {current_fps:.1f} FPS (rolling window)")
+                        self.logger.debug("Enhanced LSL processing: %.1f FPS (rolling window)", current_fps)
                     
                     last_report_time = current_time
                 
@@ -431,14 +517,14 @@ class GSCropCameraCapture:
             total_frames = len(frame_window)
             if total_duration > 0:
                 final_fps = (total_frames - 1) / total_duration
-                self.logger.info(f"Enhanced LSL worker finished: {frames_processed} frames processed, final rate: {final_fps:.1f} FPS")
+                self.logger.info("Enhanced LSL worker finished: %s frames processed, final rate: %.1f FPS", frames_processed, final_fps)
         else:
-            self.logger.info(f"Enhanced LSL worker finished: {frames_processed} frames processed")
+            self.logger.info("Enhanced LSL worker finished: %s frames processed", frames_processed)
     
     def _monitor_process_output(self, pipe, name):
         """Monitor GScrop process output and extract frame data - enhanced proven approach."""
         if pipe is None:
-            self.logger.warning(f"No {name} pipe to monitor")
+            self.logger.warning("No %s pipe to monitor", name)
             return
         
         frames_processed = 0
@@ -465,21 +551,21 @@ class GSCropCameraCapture:
                         frames_processed += 1
                         
                 except (ValueError, IndexError) as e:
-                    self.logger.debug(f"Error parsing frame data: {line_str} - {e}")
+                    self.logger.debug("Error parsing frame data: %s - %s", line_str, e)
                 continue
             
             # Log the output based on content (non-frame data)
             if "error" in line_str.lower() or "ERROR" in line_str:
                 self.logger.error(f"GScrop {name}: {line_str}")
             elif "warning" in line_str.lower() or "WARNING" in line_str:
-                self.logger.warning(f"GScrop {name}: {line_str}")
+                self.logger.warning("GScrop %s: %s", name, line_str)
             elif "FRAME_DATA:" not in line_str:  # Don't log frame data as regular output
-                self.logger.debug(f"GScrop {name}: {line_str}")
+                self.logger.debug("GScrop %s: %s", name, line_str)
         
         if frames_processed > 0:
-            self.logger.debug(f"Enhanced process output monitoring finished: {frames_processed} frames")
+            self.logger.debug("Enhanced process output monitoring finished: %s frames", frames_processed)
         
-        self.logger.debug(f"End of {name} pipe monitoring")
+        self.logger.debug("End of %s pipe monitoring", name)
     
     def _run_gscrop_script(self, duration_ms, output_path, **kwargs):
         """Run the GScrop script with specified parameters - enhanced proven approach."""
@@ -518,13 +604,18 @@ class GSCropCameraCapture:
         if os.environ.get("cam1"):
             env["cam1"] = "1"
         
-        self.logger.info(f"Starting enhanced GScrop with command: {' '.join(cmd)}")
+        # Share the auto-detected media node so GScrop does not re-scan every device
+        if self.imx296_media_device:
+            env["IMX296_MEDIA_DEVICE"] = self.imx296_media_device
         
-        # Debug output
-        self.logger.debug(f"Environment variables for enhanced GScrop:")
-        for key, value in env.items():
-            if key.startswith(('STREAM_', 'ENABLE_', 'cam', 'PREVIEW', 'no_awb', 'VIDEO_', 'FRAGMENTED_')):
-                self.logger.debug(f"  {key}={value}")
+        self.logger.info("Starting enhanced GScrop with command: %s", ' '.join(cmd))
+        
+        # Debug output - skip walking the whole environment unless it will be logged
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Environment variables for enhanced GScrop:")
+            for key, value in env.items():
+                if key.startswith(('STREAM_', 'ENABLE_', 'cam', 'PREVIEW', 'no_awb', 'VIDEO_', 'FRAGMENTED_', 'IMX296_')):
+                    self.logger.debug("  %s=%s", key, value)
         
         try:
             # Start the GScrop script
@@ -542,7 +633,7 @@ class GSCropCameraCapture:
             
             return camera_process
             
-        except Exception as e:
+        except (OSError, ValueError) as e:
             self.logger.error(f"Failed to start enhanced GScrop script: {e}")
             return None
     
@@ -565,7 +656,7 @@ class GSCropCameraCapture:
             # Start continuous video recording to a rotating buffer
             video_file = self.video_recorder.start_continuous_recording('/dev/video0')
             if video_file:
-                self.logger.info(f"Independent video recording started: {video_file}")
+                self.logger.info("Independent video recording started: %s", video_file)
             else:
                 self.logger.warning("Failed to start independent video recording")
         except Exception as e:
@@ -588,7 +679,7 @@ class GSCropCameraCapture:
         if trigger_type > 0:
             self.trigger_count += 1
         
-        self.logger.info(f"Trigger set: type={trigger_type}, time={trigger_time}")
+        self.logger.info("Trigger set: type=%s, time=%s", trigger_type, trigger_time)
     
     def handle_keyboard_trigger(self, key_command):
         """Handle keyboard trigger events.
@@ -596,7 +687,7 @@ class GSCropCameraCapture:
         Args:
             key_command: String command from keyboard (e.g., 'start_recording', 'stop_recording')
         """
-        self.logger.info(f"Keyboard trigger received: {key_command}")
+        self.logger.info("Keyboard trigger received: %s", key_command)
         
         # Set trigger for LSL streaming
         self.set_trigger(trigger_type=1, trigger_time=time.time())  # 1 = keyboard trigger
@@ -610,21 +701,21 @@ class GSCropCameraCapture:
                     try:
                         duration = float(parts[1])
                     except ValueError:
-                        self.logger.warning(f"Invalid duration in keyboard command: {parts[1]}")
+                        self.logger.warning("Invalid duration in keyboard command: %s", parts[1])
                 
                 success = self.start_recording(duration_seconds=duration)
-                self.logger.info(f"Keyboard recording start: {'success' if success else 'failed'}")
+                self.logger.info("Keyboard recording start: %s", 'success' if success else 'failed')
                 
             elif key_command == 'stop_recording':
                 stats = self.stop_recording()
-                self.logger.info(f"Keyboard recording stop: {stats.get('frame_count', 0)} frames")
+                self.logger.info("Keyboard recording stop: %s frames", stats.get('frame_count', 0))
                 
             elif key_command == 'status':
                 status = self.get_status()
-                self.logger.info(f"System status: {status}")
+                self.logger.info("System status: %s", status)
                 
             else:
-                self.logger.warning(f"Unknown keyboard command: {key_command}")
+                self.logger.warning("Unknown keyboard command: %s", key_command)
         
         except Exception as e:
             self.logger.error(f"Error handling keyboard command '{key_command}': {e}")
@@ -635,7 +726,7 @@ class GSCropCameraCapture:
     
     def _monitor_markers_file(self):
         """Monitor the markers file created by GScrop for frame timing data."""
-        self.logger.info(f"Starting markers file monitoring: {self.markers_file}")
+        self.logger.info("Starting markers file monitoring: %s", self.markers_file)
         
         # Wait for markers file to be created
         while not stop_event.is_set() and not os.path.exists(self.markers_file):
@@ -684,16 +775,16 @@ class GSCropCameraCapture:
                                         self.frame_count = frame_num
                                         
                             except (ValueError, IndexError) as e:
-                                self.logger.debug(f"Error parsing markers line '{line}': {e}")
+                                self.logger.debug("Error parsing markers line '%s': %s", line, e)
                 
                 # Minimal sleep for responsiveness
                 time.sleep(0.001)
                 
             except Exception as e:
-                self.logger.warning(f"Error monitoring markers file: {e}")
+                self.logger.warning("Error monitoring markers file: %s", e)
                 time.sleep(0.1)
         
-        self.logger.info(f"Stopped monitoring markers file after {self.frame_count} frames")
+        self.logger.info("Stopped monitoring markers file after %s frames", self.frame_count)
     
     def start_recording(self, duration_seconds=None, output_filename=None, **kwargs):
         """Start recording using enhanced GScrop script with proven approach."""
@@ -701,6 +792,11 @@ class GSCropCameraCapture:
             self.logger.warning("Recording already active")
             return False
         
+        # Cheap prerequisite check before spinning up LSL threads and the camera pipeline
+        if not os.access(self.gscrop_path, os.X_OK):
+            self.logger.error(f"GScrop script not executable at {self.gscrop_path} - skipping recording")
+            return False
+        
         try:
             # Generate output filename if not provided
             if not output_filename:
@@ -742,7 +838,7 @@ class GSCropCameraCapture:
             if self.ntfy_handler:
                 self.ntfy_handler.send_recording_started(output_path, duration_seconds)
             
-            self.logger.info(f"Enhanced recording started: {output_path}")
+            self.logger.info("Enhanced recording started: %s", output_path)
             
             # Start video recorder if available (separate process)
             if self.video_recorder:
@@ -750,7 +846,7 @@ class GSCropCameraCapture:
                     self.video_recorder.start_recording(output_filename, duration_seconds)
                     self.logger.info("Video recorder started independently")
                 except Exception as e:
-                    self.logger.warning(f"Failed to start video recorder: {e}")
+                    self.logger.warning("Failed to start video recorder: %s", e)
             
             return True
             
@@ -793,7 +889,7 @@ class GSCropCameraCapture:
                     self.video_recorder.stop_recording()
                     self.logger.info("Video recorder stopped")
                 except Exception as e:
-                    self.logger.warning(f"Error stopping video recorder: {e}")
+                    self.logger.warning("Error stopping video recorder: %s", e)
             
             # Calculate statistics
             stats = self.get_stats()
@@ -803,7 +899,7 @@ class GSCropCameraCapture:
                 self.ntfy_handler.send_recording_stopped(stats)
             
             self.recording_active = False
-            self.logger.info(f"Enhanced recording stopped. Stats: {stats['frames_captured']} frames captured")
+            self.logger.info("Enhanced recording stopped. Stats: %s frames captured", stats['frames_captured'])
             
             return True
             
@@ -849,6 +945,16 @@ class GSCropCameraCapture:
         """Check if recording is currently active."""
         return self.recording_active
     
+    def wait_for_recording(self, timeout=None):
+        """Block until the camera process exits; returns False if it is still running after timeout."""
+        if not self.camera_process:
+            return True
+        try:
+            self.camera_process.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    
     def get_status(self):
         """Get current status of the camera capture system."""
         current_time = time.time()
@@ -913,7 +1019,7 @@ class GSCropCameraCapture:
                     self.video_recorder.cleanup()
                     self.logger.info("Video recorder cleaned up")
                 except Exception as e:
-                    self.logger.warning(f"Error cleaning up video recorder: {e}")
+                    self.logger.warning("Error cleaning up video recorder: %s", e)
             
             # Stop ntfy handler
             if self.ntfy_handler:
@@ -921,7 +1027,7 @@ class GSCropCameraCapture:
                     self.ntfy_handler.stop()
                     self.logger.info("ntfy handler stopped")
                 except Exception as e:
-                    self.logger.warning(f"Error stopping ntfy handler: {e}")
+                    self.logger.warning("Error stopping ntfy handler: %s", e)
             
             # Stop status reporting
             if self.status_update_active:
@@ -947,7 +1053,7 @@ class GSCropCameraCapture:
                 duration = params.get('duration', 30)  # Default 30 seconds
                 filename = params.get('filename')
                 
-                self.logger.info(f"ntfy command: start recording for {duration}s")
+                self.logger.info("ntfy command: start recording for %ss", duration)
                 
                 if self.recording_active:
                     error_msg = "Recording already active"
@@ -1002,7 +1108,7 @@ class GSCropCameraCapture:
         if self.buffer_active:
             return
         
-        self.logger.info(f"Starting rolling buffer: {self.buffer_duration}s ({self.buffer_max_frames} frames)")
+        self.logger.info("Starting rolling buffer: %ss (%s frames)", self.buffer_duration, self.buffer_max_frames)
         self.buffer_active = True
         self.buffer_thread = threading.Thread(target=self._rolling_buffer_worker, daemon=True)
         self.buffer_thread.start()
@@ -1016,7 +1122,7 @@ class GSCropCameraCapture:
         if self.buffer_thread and self.buffer_thread.is_alive():
             self.buffer_thread.join(timeout=2)
         
-        self.logger.info(f"Rolling buffer stopped: {len(self.rolling_buffer)} frames")
+        self.logger.info("Rolling buffer stopped: %s frames", len(self.rolling_buffer))
     
     def _rolling_buffer_worker(self):
         """Worker thread for the rolling buffer."""
@@ -1055,7 +1161,7 @@ class GSCropCameraCapture:
                 self._update_status_file()
                 time.sleep(5)  # Update every 5 seconds
             except Exception as e:
-                self.logger.debug(f"Error in status update worker: {e}")
+                self.logger.debug("Error in status update worker: %s", e)
         
         self.logger.debug("Status update worker finished")
     
@@ -1064,11 +1170,15 @@ class GSCropCameraCapture:
         try:
             status = self.get_status()
             
-            with open(STATUS_FILE, 'w') as f:
-                json.dump(status, f, indent=2)
+            # Write compact JSON to a temp file and rename it into place, so the
+            # monitor never reads a half-written file
+            tmp_file = STATUS_FILE + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(status, f, separators=(',', ':'))
+            os.replace(tmp_file, STATUS_FILE)
             
         except Exception as e:
-            self.logger.debug(f"Error writing status file: {e}")
+            self.logger.debug("Error writing status file: %s", e)
 
     def trigger_event(self, source='manual'):
         """Trigger an event marker - enhanced for proven approach."""
@@ -1085,20 +1195,32 @@ class GSCropCameraCapture:
         self.last_trigger_time = trigger_time
         self.trigger_count += 1
         
-        self.logger.info(f"Enhanced event triggered from {source} at {trigger_time}")
+        self.logger.info("Enhanced event triggered from %s at %s", source, trigger_time)
         
         return True
 
 
 def signal_handler(sig, frame):
-    """Handle shutdown signals gracefully."""
+    """Handle shutdown signals by flagging them; cleanup happens in main()."""
     logger = logging.getLogger('imx296_capture')
-    logger.info(f"Received signal {sig}, shutting down...")
+    logger.info("Received signal %s, shutting down...", sig)
     
     # Set stop event for all threads
+    shutdown_event.set()
     stop_event.set()
-    
-    sys.exit(0)
+
+
+# Background listener that writes queued log records to the real handlers
+log_listener = None
+
+
+def _stop_log_listener():
+    """Flush queued log records on interpreter exit."""
+    if log_listener:
+        log_listener.stop()
+
+
+atexit.register(_stop_log_listener)
 
 
 def setup_logging(config):
@@ -1133,9 +1255,18 @@ def setup_logging(config):
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
-    # Add our handlers
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+    # Stop a listener left over from a previous setup before replacing it
+    global log_listener
+    if log_listener:
+        log_listener.stop()
+    
+    # Route records through a queue so capture threads never block on console/SD card writes
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    log_listener.start()
     
     # Set specific logger levels
     logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -1144,11 +1275,19 @@ def setup_logging(config):
 
 def load_config(config_file="config/config.yaml"):
     """Load configuration from YAML file with fallback defaults."""
+    # Imported here since configuration is only read once, at startup
+    try:
+        import yaml
+        # Prefer the libyaml C parser when PyYAML was built with it
+        yaml_loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    except ImportError:
+        yaml = None
+    
     try:
         config_path = Path(config_file)
         if config_path.exists():
             with open(config_path, 'r') as f:
-                config = yaml.safe_load(f) if yaml else {}
+                config = yaml.load(f, Loader=yaml_loader) if yaml else {}
             print(f"Loaded configuration from {config_path}")
         else:
             print(f"Config file {config_path} not found, using defaults")
@@ -1205,6 +1344,10 @@ def load_config(config_file="config/config.yaml"):
 
 def main():
     """Main entry point for running the capture system."""
+    # Change working directory to project root for consistent file access;
+    # done here rather than at import so importing the module has no side effects
+    os.chdir(project_root)
+    
     try:
         # Parse command line arguments
         import argparse
@@ -1222,9 +1365,14 @@ def main():
         setup_logging(config)
         logger = logging.getLogger('imx296_capture')
         
-        # Register signal handlers
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        # Register signal handlers - interactive mode blocks in input(), so there
+        # both signals raise KeyboardInterrupt, which its command loop handles
+        if args.interactive:
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+        else:
+            signal.signal(signal.SIGINT, signal_handler)
+            signal.signal(signal.SIGTERM, signal_handler)
         
         logger.info("Enhanced IMX296 Camera Capture System starting...")
         
@@ -1260,15 +1408,15 @@ def main():
             
             elif args.duration:
                 # Single recording mode
-                logger.info(f"Starting single recording for {args.duration} seconds...")
-                capture.start_recording(duration_seconds=args.duration, output_filename=args.output)
-                
-                # Wait for recording to complete
-                while capture.is_recording():
-                    time.sleep(0.5)
+                logger.info("Starting single recording for %s seconds...", args.duration)
+                if capture.start_recording(duration_seconds=args.duration, output_filename=args.output):
+                    # Block on the GScrop process instead of polling; it exits once the duration elapses
+                    while not shutdown_event.is_set() and not capture.wait_for_recording(timeout=1.0):
+                        pass
+                    capture.stop_recording()
                 
                 stats = capture.get_stats()
-                logger.info(f"Recording completed: {stats}")
+                logger.info("Recording completed: %s", stats)
             
             else:
                 # Service mode
@@ -1279,9 +1427,8 @@ def main():
                     capture.ntfy_handler.start()
                     logger.info("ntfy handler started - camera can be controlled remotely")
                 
-                # Keep running
-                while not stop_event.is_set():
-                    time.sleep(1)
+                # Keep running until a shutdown signal arrives
+                shutdown_event.wait()
         
         finally:
             capture.cleanup()
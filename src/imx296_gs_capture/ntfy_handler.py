@@ -10,7 +10,6 @@ Author: Anzal KS <anzal.ks@gmail.com>
 Date: May 23, 2025
 """
 
-import requests
 import threading
 import time
 import json
@@ -105,6 +104,9 @@ class NtfyHandler:
     
     def _check_messages(self):
         """Check for new messages from ntfy."""
+        # Imported lazily so the capture system does not load requests unless ntfy is enabled
+        import requests
+        
         try:
             url = f"{self.server}/{self.topic}/json"
             params = {}
@@ -232,6 +234,8 @@ class NtfyHandler:
     
     def _send_notification(self, title: str, message: str, tags: list = None, priority: int = 3):
         """Send a notification via ntfy."""
+        import requests
+        
         try:
             url = f"{self.server}/{self.topic}"
             
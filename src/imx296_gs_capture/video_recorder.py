@@ -11,7 +11,11 @@ Date: May 23, 2025
 """
 
 import os
+import heapq
+import operator
+import signal
 import subprocess
+import tempfile
 import threading
 import time
 import logging
@@ -20,6 +24,13 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 import shutil
 
+# Keep ffmpeg's stderr to warnings and errors; per-frame progress stats would
+# otherwise grow the spooled stderr file for the whole recording
+FFMPEG_GLOBAL_ARGS = ('-hide_banner', '-nostats', '-loglevel', 'warning')
+
+# Project root resolved once at import rather than per recorder instance
+project_root = Path(__file__).resolve().parent.parent.parent
+
 
 class VideoRecorder:
     """Handles video recording pipeline with ffmpeg using dynamic paths."""
@@ -34,9 +45,6 @@ class VideoRecorder:
         self.config = config
         self.logger = logging.getLogger(__name__)
         
-        # Dynamic path detection for project root
-        project_root = Path(__file__).resolve().parent.parent.parent
-        
         # Recording configuration with dynamic path resolution
         output_dir = self.config.get('output_dir', 'recordings')
         if os.path.isabs(output_dir):
@@ -64,6 +72,7 @@ class VideoRecorder:
         self.recording = False
         self.current_output_file = None
         self.current_process = None
+        self.stderr_file = None
         self.recording_thread = None
         self.start_time = None
         self.frame_count = 0
@@ -142,12 +151,7 @@ class VideoRecorder:
             self.logger.debug(f"ffmpeg command: {' '.join(cmd)}")
             
             # Start recording process
-            self.current_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env=os.environ.copy()
-            )
+            self.current_process = self._spawn_ffmpeg(cmd)
             
             self.recording = True
             self.start_time = time.time()
@@ -200,12 +204,7 @@ class VideoRecorder:
             self.logger.debug(f"ffmpeg command: {' '.join(cmd)}")
             
             # Start recording process
-            self.current_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env=os.environ.copy()
-            )
+            self.current_process = self._spawn_ffmpeg(cmd)
             
             self.recording = True
             self.start_time = time.time()
@@ -227,46 +226,80 @@ class VideoRecorder:
             self.current_output_file = None
             return None
     
-    def _build_ffmpeg_command(self, input_source: str, output_file: Path, duration: Optional[float] = None) -> list:
-        """Build ffmpeg command based on configuration."""
-        cmd = [self.ffmpeg_path]
-        
-        # Input options
+    def _spawn_ffmpeg(self, cmd: list) -> subprocess.Popen:
+        """Start ffmpeg with stderr spooled to a temp file rather than an undrained pipe."""
+        self._close_stderr()
+        
+        # A PIPE nobody reads fills after 64 KiB and then blocks ffmpeg mid-recording
+        self.stderr_file = tempfile.TemporaryFile()
+        return subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=self.stderr_file,
+            env=os.environ.copy()
+        )
+    
+    def _read_stderr(self) -> str:
+        """Read what the current ffmpeg process has written to stderr."""
+        if not self.stderr_file:
+            return ''
+        self.stderr_file.seek(0)
+        return self.stderr_file.read().decode('utf-8', errors='replace')
+    
+    def _close_stderr(self):
+        """Close the spooled ffmpeg stderr file, releasing its fd and temp space."""
+        if self.stderr_file:
+            self.stderr_file.close()
+            self.stderr_file = None
+    
+    def _input_args(self, input_source: str) -> list:
+        """Build the ffmpeg input options shared by all recording modes."""
         if input_source.startswith('/dev/video'):
-            # Video device input
-            cmd.extend([
+            # Video device input - live source, so skip ffmpeg's probe/analyze
+            # buffering before the first frame is written
+            return [
+                '-fflags', 'nobuffer',
+                '-flags', 'low_delay',
+                '-probesize', '32',
+                '-analyzeduration', '0',
                 '-f', 'v4l2',
                 '-input_format', 'mjpeg',
                 '-video_size', '900x600',  # Updated resolution
                 '-framerate', '100',
                 '-i', input_source
-            ])
-        else:
-            # File input (from GScrop raw output)
-            cmd.extend(['-i', input_source])
-        
-        # Duration if specified
-        if duration:
-            cmd.extend(['-t', str(duration)])
-        
-        # Video encoding options
+            ]
+        # File input (from GScrop raw output)
+        return ['-i', input_source]
+    
+    def _codec_args(self, h264_preset: str) -> list:
+        """Build the ffmpeg video encoding options shared by all recording modes."""
         if self.codec == 'mjpeg':
-            cmd.extend([
+            return [
                 '-c:v', 'mjpeg',
                 '-q:v', str(100 - self.quality)  # ffmpeg uses inverse quality scale for MJPEG
-            ])
-        elif self.codec == 'h264':
-            cmd.extend([
+            ]
+        if self.codec == 'h264':
+            return [
                 '-c:v', 'libx264',
-                '-preset', 'fast',
+                '-preset', h264_preset,
                 '-crf', str(51 - int(self.quality * 0.51))  # Convert quality to CRF
-            ])
-        else:
-            cmd.extend(['-c:v', self.codec])
+            ]
+        return ['-c:v', self.codec]
+    
+    def _build_ffmpeg_command(self, input_source: str, output_file: Path, duration: Optional[float] = None) -> list:
+        """Build ffmpeg command based on configuration."""
+        cmd = [self.ffmpeg_path, *FFMPEG_GLOBAL_ARGS, *self._input_args(input_source)]
+        
+        # Duration if specified
+        if duration:
+            cmd.extend(['-t', str(duration)])
+        
+        cmd.extend(self._codec_args('fast'))
         
         # Output options
         cmd.extend([
             '-f', self.video_format,
+            '-flush_packets', '1',  # Write each packet out instead of coalescing
             '-y',  # Overwrite output file
             str(output_file)
         ])
@@ -275,40 +308,15 @@ class VideoRecorder:
     
     def _build_continuous_ffmpeg_command(self, input_source: str, output_file: Path) -> list:
         """Build ffmpeg command for continuous recording."""
-        cmd = [self.ffmpeg_path]
+        cmd = [self.ffmpeg_path, *FFMPEG_GLOBAL_ARGS, *self._input_args(input_source)]
         
-        # Input options for continuous recording
-        if input_source.startswith('/dev/video'):
-            # Video device input with updated resolution
-            cmd.extend([
-                '-f', 'v4l2',
-                '-input_format', 'mjpeg',
-                '-video_size', '900x600',  # Updated resolution
-                '-framerate', '100',
-                '-i', input_source
-            ])
-        else:
-            # File input
-            cmd.extend(['-i', input_source])
-        
-        # Video encoding options for continuous recording
-        if self.codec == 'mjpeg':
-            cmd.extend([
-                '-c:v', 'mjpeg',
-                '-q:v', str(100 - self.quality)
-            ])
-        elif self.codec == 'h264':
-            cmd.extend([
-                '-c:v', 'libx264',
-                '-preset', 'ultrafast',  # Faster preset for continuous recording
-                '-crf', str(51 - int(self.quality * 0.51))
-            ])
-        else:
-            cmd.extend(['-c:v', self.codec])
+        # Faster preset for continuous recording
+        cmd.extend(self._codec_args('ultrafast'))
         
         # Output options for continuous recording
         cmd.extend([
             '-f', self.video_format,
+            '-flush_packets', '1',  # Write each packet out instead of coalescing
             '-segment_time', '300',  # 5-minute segments
             '-segment_format', self.video_format,
             '-reset_timestamps', '1',
@@ -332,7 +340,7 @@ class VideoRecorder:
             if self.current_process.returncode == 0:
                 self.logger.info("Video recording completed successfully")
             else:
-                stderr_output = self.current_process.stderr.read().decode('utf-8')
+                stderr_output = self._read_stderr()
                 self.logger.warning(f"Video recording ended with return code {self.current_process.returncode}")
                 self.logger.debug(f"ffmpeg stderr: {stderr_output}")
             
@@ -341,6 +349,9 @@ class VideoRecorder:
         except Exception as e:
             self.logger.error(f"Error monitoring video recording: {e}")
         finally:
+            # Done with stderr once the process has ended and it has been read;
+            # closed before clearing the flag so a new recording's file is never hit
+            self._close_stderr()
             self.recording = False
     
     def _monitor_continuous_recording(self):
@@ -384,10 +395,11 @@ class VideoRecorder:
             if self.start_time:
                 stats['duration'] = time.time() - self.start_time
             
-            # Terminate ffmpeg process gracefully
+            # Stop ffmpeg with SIGINT, which makes it finalize the container
+            # (SIGTERM can leave the file without its index)
             if self.current_process and self.current_process.poll() is None:
                 self.logger.info("Stopping video recording...")
-                self.current_process.terminate()
+                self.current_process.send_signal(signal.SIGINT)
                 
                 try:
                     self.current_process.wait(timeout=5)
@@ -444,6 +456,7 @@ class VideoRecorder:
         if self.recording:
             self.stop_recording()
         
+        self._close_stderr()
         self.logger.info("Video recorder cleanup completed")
     
     def list_recordings(self, days: int = 7) -> list:
@@ -459,32 +472,34 @@ class VideoRecorder:
         recordings = []
         
         try:
-            # Look through date folders
-            for date_folder in self.base_dir.iterdir():
-                if not date_folder.is_dir():
-                    continue
-                
-                video_folder = date_folder / "video"
-                if not video_folder.exists():
-                    continue
-                
-                # List video files
-                for video_file in video_folder.glob(f"*.{self.video_format}"):
-                    try:
-                        stat = video_file.stat()
-                        recordings.append({
-                            'file': str(video_file),
-                            'date': date_folder.name,
-                            'size_mb': stat.st_size / (1024 * 1024),
-                            'modified': datetime.fromtimestamp(stat.st_mtime)
-                        })
-                    except OSError:
-                        continue
+            suffix = f".{self.video_format}"
+            
+            # Look through date folders; DirEntry carries the type from the directory read
+            with os.scandir(self.base_dir) as date_entries:
+                date_folders = [entry for entry in date_entries if entry.is_dir()]
             
-            # Sort by modification time (newest first)
-            recordings.sort(key=lambda x: x['modified'], reverse=True)
+            for date_folder in date_folders:
+                try:
+                    with os.scandir(os.path.join(date_folder.path, "video")) as video_entries:
+                        # List video files
+                        for video_file in video_entries:
+                            if not video_file.name.endswith(suffix):
+                                continue
+                            try:
+                                stat = video_file.stat()
+                            except OSError:
+                                continue
+                            recordings.append({
+                                'file': video_file.path,
+                                'date': date_folder.name,
+                                'size_mb': stat.st_size / (1024 * 1024),
+                                'modified': datetime.fromtimestamp(stat.st_mtime)
+                            })
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
             
-            return recordings[:days * 10]  # Reasonable limit
+            # Newest first, selecting only the entries we return instead of sorting them all
+            return heapq.nlargest(days * 10, recordings, key=operator.itemgetter('modified'))  # Reasonable limit
             
         except Exception as e:
             self.logger.error(f"Error listing recordings: {e}")
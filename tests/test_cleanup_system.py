@@ -72,6 +72,24 @@ class TestCleanupSystem(unittest.TestCase):
         service_check_calls = [call for call in calls if 'is-active' in str(call)]
         self.assertTrue(len(service_check_calls) > 0)
     
+    @patch('subprocess.run')
+    def test_get_active_services_single_call(self, mock_run):
+        """Test that service states are read with one systemctl call."""
+        states = ['inactive'] * len(self.cleanup.systemd_services)
+        states[1] = 'active'
+        mock_run.return_value = MagicMock(returncode=0, stdout="\n".join(states), stderr="")
+
+        active = self.cleanup.get_active_services()
+
+        self.assertEqual(active, [self.cleanup.systemd_services[1]])
+        mock_run.assert_called_once()
+
+    @patch('subprocess.run', side_effect=FileNotFoundError("systemctl"))
+    def test_missing_tools_find_nothing(self, mock_run):
+        """Test that hosts without systemctl or pgrep report no services or processes."""
+        self.assertEqual(self.cleanup.get_active_services(), [])
+        self.assertEqual(self.cleanup.find_related_pids(), [])
+    
     @patch('os.path.exists')
     @patch('subprocess.run')
     def test_disable_systemd_services(self, mock_run, mock_exists):
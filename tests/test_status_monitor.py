@@ -151,6 +151,35 @@ class TestStatusMonitor(unittest.TestCase):
         status = self.monitor.load_status()
         self.assertFalse(status['service_running'])
     
+    def test_load_status_cached_until_file_changes(self):
+        """Test that an unchanged status file is not re-parsed."""
+        with open(self.test_status_file, 'w') as f:
+            json.dump({'service_running': True, 'uptime': 1.0}, f)
+        
+        first = self.monitor.load_status()
+        with patch('bin.status_monitor.json.loads') as mock_loads:
+            self.assertIs(self.monitor.load_status(), first)
+            mock_loads.assert_not_called()
+        
+        # A rewrite with different content is picked up
+        with open(self.test_status_file, 'w') as f:
+            json.dump({'service_running': False, 'uptime': 22.0}, f)
+        self.assertEqual(self.monitor.load_status()['uptime'], 22.0)
+    
+    def test_wait_for_status_file(self):
+        """Test waiting for the status file returns as soon as it exists."""
+        from bin.status_monitor import wait_for_status_file
+
+        # Missing file times out
+        self.assertFalse(wait_for_status_file(0.1))
+
+        # Existing file returns immediately
+        with open(self.test_status_file, 'w') as f:
+            f.write("{}")
+        start = time.monotonic()
+        self.assertTrue(wait_for_status_file(2.0))
+        self.assertLess(time.monotonic() - start, 1.0)
+
     @patch('curses.wrapper')
     def test_monitor_initialization(self, mock_wrapper):
         """Test monitor initialization and main function."""